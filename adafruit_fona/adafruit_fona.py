@@ -82,6 +82,7 @@ class FONA:
 
     TCP_MODE = const(0)  # TCP socket
     UDP_MODE = const(1)  # UDP socket
+    max_sockets = FONA_MAX_SOCKETS  # sockets supported by the module
 
     # pylint: disable=too-many-arguments
     def __init__(self, uart, rst, ri=None, debug=False):
@@ -617,8 +618,9 @@ class FONA:
             self._read_line()
         return self._buf
 
-    def get_socket(self):
-        """Returns an avaliable socket (INITIAL or CLOSED state).
+    def get_socket(self, claimed=0):
+        """Returns an avaliable socket (INITIAL or CLOSED state), or FONA_MAX_SOCKETS.
+        :param int claimed: Bitmask of sockets the caller already holds, to skip.
 
         """
         if self._debug:
@@ -628,15 +630,16 @@ class FONA:
         self._read_line(100)  # OK
         self._read_line(100)  # table header
 
-        allocated_socket = 0
+        allocated_socket = FONA_MAX_SOCKETS
         for sock in range(0, FONA_MAX_SOCKETS):  # check if INITIAL state
             self._read_line(100)
             self._parse_reply(b"C:", idx=5)
-            if self._buf.strip('"') == "INITIAL" or self._buf.strip('"') == "CLOSED":
+            free = self._buf.strip('"') in ("INITIAL", "CLOSED")
+            if free and not claimed >> sock & 1:
                 allocated_socket = sock
                 break
         # read out the rest of the responses
-        for _ in range(allocated_socket, FONA_MAX_SOCKETS):
+        for _ in range(sock, FONA_MAX_SOCKETS):
             self._read_line(100)
         if self._debug:
             print("Allocated socket #%d" % allocated_socket)
@@ -647,10 +650,7 @@ class FONA:
         :param int sock_num: Desired socket.
 
         """
-        assert (
-            sock_num < FONA_MAX_SOCKETS
-        ), "Provided socket exceeds the maximum number of \
-                                             sockets for the FONA module."
+        self._check_socket(sock_num)
         self._uart_write(b"AT+CIPSTATUS=" + str(sock_num).encode() + b"\r\n")
         self._read_line(100)
 
@@ -662,10 +662,7 @@ class FONA:
         :param int sock_num: Desired socket number.
 
         """
-        assert (
-            sock_num < FONA_MAX_SOCKETS
-        ), "Provided socket exceeds the maximum number of \
-                                             sockets for the FONA module."
+        self._check_socket(sock_num)
         if not self._send_check_reply(b"AT+CIPSTATUS", reply=REPLY_OK, timeout=100):
             return False
         self._read_line()
@@ -692,10 +689,7 @@ class FONA:
         :param int sock_num: Desired socket to return bytes available from.
 
         """
-        assert (
-            sock_num < FONA_MAX_SOCKETS
-        ), "Provided socket exceeds the maximum number of \
-                                             sockets for the FONA module."
+        self._check_socket(sock_num)
         if not self._send_parse_reply(
             b"AT+CIPRXGET=4," + str(sock_num).encode(),
             b"+CIPRXGET: 4," + str(sock_num).encode() + b",",
@@ -727,10 +721,7 @@ class FONA:
             )
 
         self._uart.reset_input_buffer()
-        assert (
-            sock_num < FONA_MAX_SOCKETS
-        ), "Provided socket exceeds the maximum number of \
-                                             sockets for the FONA module."
+        self._check_socket(sock_num)
 
         # Query local IP Address
         self._uart_write(b"AT+CIFSR\r\n")
@@ -758,10 +749,7 @@ class FONA:
         """
         if self._debug:
             print("*** Closing socket #%d" % sock_num)
-        assert (
-            sock_num < FONA_MAX_SOCKETS
-        ), "Provided socket exceeds the maximum number of \
-                                             sockets for the FONA module."
+        self._check_socket(sock_num)
 
         self._uart_write(b"AT+CIPCLOSE=" + str(sock_num).encode() + b"\r\n")
         self._read_line(3000)
@@ -780,47 +768,54 @@ class FONA:
         :param int sock_num: Desired socket to read from.
         :param int length: Desired length to read.
 
+        """
+        buffer = bytearray(length)
+        return bytes(memoryview(buffer)[: self.socket_read_into(sock_num, buffer)])
+
+    def socket_read_into(self, sock_num, buffer):
+        """Read data from the network into buffer, returns the amount of bytes read.
+        :param int sock_num: Desired socket to read from.
+        :param bytearray buffer: Buffer (or memoryview slice) to fill, up to its length.
+
         """
         self._read_line()
-        assert (
-            sock_num < FONA_MAX_SOCKETS
-        ), "Provided socket exceeds the maximum number of \
-                                             sockets for the FONA module."
+        self._check_socket(sock_num)
         if self._debug:
             print("* socket read")
 
         self._uart_write(b"AT+CIPRXGET=2," + str(sock_num).encode() + b",")
-        self._uart_write(str(length).encode() + b"\r\n")
+        self._uart_write(str(len(buffer)).encode() + b"\r\n")
         self._read_line()
 
         if not self._parse_reply(b"+CIPRXGET:"):
-            return False
+            return 0
 
-        return self._uart.read(length)
+        return self._uart.readinto(buffer) or 0
 
     def socket_write(self, sock_num, buffer, timeout=3000):
         """Writes bytes to the socket.
         :param int sock_num: Desired socket number to write to.
-        :param bytes buffer: Bytes to write to socket.
+        :param bytes buffer: Bytes to write, or a list/tuple of byte buffers to write.
         :param int timeout: Socket write timeout, in milliseconds.
 
         """
+        if not isinstance(buffer, (list, tuple)):
+            buffer = (buffer,)
         self._read_line()
-        assert (
-            sock_num < FONA_MAX_SOCKETS
-        ), "Provided socket exceeds the maximum number of \
-                                             sockets for the FONA module."
+        self._check_socket(sock_num)
 
         self._uart.reset_input_buffer()
         self._uart_write(b"AT+CIPSEND=" + str(sock_num).encode())
-        self._uart_write(b"," + str(len(buffer)).encode() + b"\r\n")
+        self._uart_write(b"," + str(sum(len(f) for f in buffer)).encode() + b"\r\n")
         self._read_line()
 
         if self._buf[0] != 62:
             # promoting mark ('>') not found
             return False
 
-        self._uart_write(buffer + b"\r\n")
+        for fragment in buffer:
+            self._uart_write(fragment)
+        self._uart_write(b"\r\n")
         self._read_line(timeout)
 
         if "SEND OK" not in self._buf.decode():
@@ -828,16 +823,20 @@ class FONA:
 
         return True
 
+    def _check_socket(self, sock_num):
+        """Asserts that sock_num is a valid socket number for this module."""
+        assert sock_num < self.max_sockets, "Provided socket exceeds max_sockets."
+
     ### UART Reply/Response Helpers ###
 
     def _uart_write(self, buffer):
         """UART ``write`` with optional debug that prints
         the buffer before sending.
-        :param bytes buffer: Buffer of bytes to send to the bus.
+        :param bytes buffer: Bytes, bytearray or memoryview to send to the bus.
 
         """
         if self._debug:
-            print("\tUARTWRITE ::", buffer.decode())
+            print("\tUARTWRITE ::", bytes(buffer).decode())
         self._uart.write(buffer)
 
     def _send_parse_reply(self, send_data, reply_data, divider=",", idx=0):
@@ -26,10 +26,14 @@
 
 A socket compatible interface with the Adafruit FONA cellular module.
 
+Sockets only run the garbage collector after very large ``recv()`` reads,
+otherwise the application owns its garbage collection policy.
+
 * Author(s): ladyada, Brent Rubell
 
 """
 import gc
+import struct
 import time
 from micropython import const
 
@@ -44,17 +48,12 @@ def set_interface(iface):
 
 def htonl(x):
     """Convert 32-bit positive integers from host to network byte order."""
-    return (
-        ((x) << 24 & 0xFF000000)
-        | ((x) << 8 & 0x00FF0000)
-        | ((x) >> 8 & 0x0000FF00)
-        | ((x) >> 24 & 0x000000FF)
-    )
+    return struct.unpack("<I", struct.pack(">I", x & 0xFFFFFFFF))[0]
 
 
 def htons(x):
     """Convert 16-bit positive integers from host to network byte order."""
-    return (((x) << 8) & 0xFF00) | (((x) >> 8) & 0xFF)
+    return struct.unpack("<H", struct.pack(">H", x & 0xFFFF))[0]
 
 
 # pylint: disable=bad-whitespace
@@ -63,28 +62,135 @@ TCP_MODE = 80
 SOCK_DGRAM = const(0x01)  # UDP
 AF_INET = const(3)
 NO_SOCKET_AVAIL = const(255)
+_RECV_BUF_SIZE = const(1024)  # initial size of each socket's receive buffer
+_BUFFER_POOL_SIZE = const(2)  # maximum number of receive buffers kept for reuse
+_DNS_TTL = const(300)  # seconds a resolved hostname is cached for
+_DNS_MAX = const(16)  # maximum number of cached hostnames
+_GC_THRESHOLD = const(4096)  # recv() results larger than this trigger gc.collect()
+_MIN_READ_CHUNK = const(64)  # smaller reads wait briefly for more data to arrive
 # pylint: enable=bad-whitespace
 
-# keep track of sockets we allocate
-SOCKETS = []
+_BUSY_POLL_WINDOW = 0.01  # seconds to keep polling tightly after data arrives
+_IDLE_POLL_SLEEP = 0.002  # seconds to sleep between polls once idle
+_COALESCE_WINDOW = 0.02  # seconds a small read may be held back for more data
+
+# keep track of sockets we allocate, bit n is set while socket n is in use
+_SOCKET_BITMAP = 0
+# bit n is set when socket n was dropped without close() and still needs closing
+_CLOSE_PENDING = 0
+
+# receive buffers of closed sockets, waiting to be reused by new sockets
+_BUFFER_POOL = []
+
+# hostname -> (address, time resolved)
+_DNS_CACHE = {}
+# (host, port, socktype, proto) -> (getaddrinfo result, time host was resolved)
+_AI_CACHE = {}
 
 # pylint: disable=too-many-arguments, unused-argument
 def getaddrinfo(host, port, family=0, socktype=0, proto=0, flags=0):
     """Translate the host/port argument into a sequence of 5-tuples that
     contain all the necessary arguments for creating a socket connected to that service.
+    Results are cached for as long as the host's address is.
     """
     if not isinstance(port, int):
         raise RuntimeError("Port must be an integer")
-    return [(AF_INET, socktype, proto, "", (gethostbyname(host), port))]
+    key = (host, port, socktype, proto)
+    entry = _AI_CACHE.get(key)
+    if entry:
+        # reuse the result for as long as the address it holds is cached
+        resolved = _DNS_CACHE.get(host)
+        if (
+            resolved
+            and resolved[1] == entry[1]
+            and time.monotonic() - entry[1] < _DNS_TTL
+        ):
+            return entry[0]
+    result = ((AF_INET, socktype, proto, "", (gethostbyname(host), port)),)
+    if key not in _AI_CACHE and len(_AI_CACHE) >= _DNS_MAX:
+        del _AI_CACHE[min(_AI_CACHE, key=lambda k: _AI_CACHE[k][1])]
+    _AI_CACHE[key] = (result, _DNS_CACHE[host][1])
+    return result
 
 
 def gethostbyname(hostname):
     """Translate a host name to IPv4 address format. The IPv4 address
-    is returned as a string.
+    is returned as a string. Results are cached for _DNS_TTL seconds.
     :param str hostname: Desired hostname.
     """
-    addr = _the_interface.get_host_by_name(hostname)
-    return addr.strip('"')
+    now = time.monotonic()
+    entry = _DNS_CACHE.get(hostname)
+    if entry and now - entry[1] < _DNS_TTL:
+        return entry[0]
+    addr = _the_interface.get_host_by_name(hostname).strip('"')
+    if hostname not in _DNS_CACHE and len(_DNS_CACHE) >= _DNS_MAX:
+        # evict the oldest lookup
+        del _DNS_CACHE[min(_DNS_CACHE, key=lambda host: _DNS_CACHE[host][1])]
+    _DNS_CACHE[hostname] = (addr, now)
+    return addr
+
+
+def _alloc_slot():
+    """Claims a free socket number. The module is asked which of its sockets
+    is free (INITIAL or CLOSED), so a socket it still holds open, e.g. across
+    a soft reload of the board, is not handed out again.
+    Returns NO_SOCKET_AVAIL if all sockets are in use.
+
+    """
+    global _SOCKET_BITMAP  # pylint: disable=global-statement, invalid-name
+    _close_pending()
+    max_sockets = _the_interface.max_sockets
+    if _SOCKET_BITMAP == (1 << max_sockets) - 1:
+        return NO_SOCKET_AVAIL  # all claimed, no need to ask the module
+    # skip sockets we claimed but have not connected yet, which the
+    # module still reports as free
+    slot = _the_interface.get_socket(_SOCKET_BITMAP)
+    if slot >= max_sockets:
+        return NO_SOCKET_AVAIL
+    _SOCKET_BITMAP |= 1 << slot
+    return slot
+
+
+def _free_slot(slot):
+    """Releases a socket number claimed by _alloc_slot.
+    :param int slot: Socket number.
+
+    """
+    global _SOCKET_BITMAP  # pylint: disable=global-statement, invalid-name
+    _SOCKET_BITMAP &= ~(1 << slot)
+
+
+def _close_pending():
+    """Closes sockets queued by socket.__del__ and releases their numbers.
+    This is done here, rather than in __del__, so that the module is never
+    sent AT commands from inside a garbage collection.
+
+    """
+    global _CLOSE_PENDING  # pylint: disable=global-statement, invalid-name
+    slot = 0
+    while _CLOSE_PENDING:
+        if _CLOSE_PENDING & 1 << slot:
+            _CLOSE_PENDING &= ~(1 << slot)
+            _the_interface.socket_close(slot)
+            _free_slot(slot)
+        slot += 1
+
+
+def _as_bytes(buffer):
+    """Returns buffer as a byte buffer, so len() counts bytes (not items) for
+    AT+CIPSEND. Ports without memoryview.cast must be given byte buffers.
+    :param bytes buffer: Bytes, bytearray or memoryview.
+
+    """
+    if not hasattr(memoryview, "cast"):
+        return buffer
+    return memoryview(buffer).cast("B")
+
+
+def clear_dns_cache():
+    """Discards all cached gethostbyname and getaddrinfo results."""
+    _DNS_CACHE.clear()
+    _AI_CACHE.clear()
 
 
 # pylint: disable=invalid-name, redefined-builtin
@@ -96,21 +202,39 @@ class socket:
 
     """
 
-    def __init__(
-        self, family=AF_INET, type=SOCK_STREAM, proto=0, fileno=None, socknum=None
-    ):
+    # Poll the module tightly for a short while after data arrives, set
+    # False to always sleep between polls when sharing the CPU with other work.
+    _busy_poll = True
+
+    def __init__(self, family=AF_INET, type=SOCK_STREAM, proto=0):
         if family != AF_INET:
             raise RuntimeError("Only AF_INET family supported by cellular sockets.")
+        # pending received data lives in self._buf[self._head:self._tail]
+        self._buf = _BUFFER_POOL.pop() if _BUFFER_POOL else bytearray(_RECV_BUF_SIZE)
         self._sock_type = type
-        self._buffer = b""
-        if hasattr(_the_interface, "tx_timeout"):
-            self._timeout = _the_interface.tx_timeout
-        else:
-            self._timeout = 3000  # FONA800
+        self._head = 0
+        self._tail = 0
+        self._scanned = 0  # pending bytes readline already searched for '\r\n'
+        self._avail_cache = 0  # bytes the module reported and we have not read yet
+        # tx_timeout queries the module, so only read it once (FONA800 has none)
+        self._timeout = getattr(_the_interface, "tx_timeout", 3000)
+        self._socknum = _alloc_slot()
+        if self._socknum == NO_SOCKET_AVAIL:
+            # Sockets dropped without close() are queued for closing by
+            # __del__, so collect them and retry once before giving up. This
+            # only helps where finalizers run (e.g. CPython): MicroPython and
+            # CircuitPython do not call __del__ on Python classes.
+            gc.collect()
+            self._socknum = _alloc_slot()
+            if self._socknum == NO_SOCKET_AVAIL:
+                raise RuntimeError("No free sockets available on the FONA module.")
 
-        self._socknum = _the_interface.get_socket()
-        SOCKETS.append(self._socknum)
-        self.settimeout(self._timeout)
+    def __del__(self):
+        # no UART I/O from inside a collection, _alloc_slot closes it later
+        global _CLOSE_PENDING  # pylint: disable=global-statement, invalid-name
+        socknum = getattr(self, "_socknum", NO_SOCKET_AVAIL)
+        if socknum != NO_SOCKET_AVAIL:
+            _CLOSE_PENDING |= 1 << socknum
 
     @property
     def socknum(self):
@@ -126,15 +250,15 @@ class socket:
         """Return the remote address to which the socket is connected."""
         return _the_interface.remote_ip(self.socknum)
 
-    def inet_aton(self, ip_string):
+    @staticmethod
+    def inet_aton(ip_string):
         """Convert an IPv4 address from dotted-quad string format.
         :param str ip_string: IP Address, as a dotted-quad string.
 
         """
-        self._buffer = b""
-        self._buffer = [int(item) for item in ip_string.split(".")]
-        self._buffer = bytearray(self._buffer)
-        return self._buffer
+        parts = ip_string.split(".")
+        assert len(parts) == 4, "IP address must be a dotted-quad string."
+        return bytes(int(part) for part in parts)
 
     def connect(self, address, conn_mode=None):
         """Connect to a remote socket at address. (The format of address depends
@@ -152,83 +276,245 @@ class socket:
             self.socknum, host, port, conn_mode=self._sock_type
         ):
             raise RuntimeError("Failed to connect to host", host)
-        self._buffer = b""
+        self._head = self._tail = self._scanned = self._avail_cache = 0
 
     def send(self, data):
         """Send data to the socket. The socket must be connected to
         a remote socket prior to calling this method.
-        :param bytes data: Desired data to send to the socket.
+        :param bytes data: Desired data to send to the socket. May also be a
+                           bytearray or a memoryview slice, which is sent
+                           without being copied.
 
         """
-        _the_interface.socket_write(self._socknum, data, self._timeout)
-        gc.collect()
+        _the_interface.socket_write(self._socknum, _as_bytes(data), self._timeout)
+
+    def send_iovec(self, fragments):
+        """Send several buffers to the socket as a single write, without
+        joining them first. The socket must be connected to a remote
+        socket prior to calling this method.
+        :param list fragments: Buffers to send, in order.
+
+        """
+        fragments = tuple(_as_bytes(fragment) for fragment in fragments)
+        _the_interface.socket_write(self._socknum, fragments, self._timeout)
+
+    def _fill(self, avail):
+        """Reads up to avail bytes from the modem into the receive buffer.
+        Returns the amount of bytes read.
+        :param int avail: Maximum number of bytes to read.
+
+        """
+        if self._head == self._tail:
+            self._head = self._tail = 0
+        elif self._head and self._tail + avail > len(self._buf):
+            # slide pending bytes to the front of the buffer to make room
+            pending = self._tail - self._head
+            mv = memoryview(self._buf)
+            mv[:pending] = mv[self._head : self._tail]
+            self._head = 0
+            self._tail = pending
+        if self._tail == len(self._buf):
+            # buffer is full of pending data, grow it (only for oversized lines)
+            self._buf.extend(bytes(len(self._buf)))
+        want = min(avail, len(self._buf) - self._tail)
+        count = _the_interface.socket_read_into(
+            self._socknum, memoryview(self._buf)[self._tail : self._tail + want]
+        )
+        self._tail += count
+        self._consumed(count, want)
+        return count
+
+    def _consumed(self, count, want):
+        """Updates the cached available count after a read.
+        :param int count: Bytes actually read.
+        :param int want: Bytes requested.
+
+        """
+        if count < want:
+            # short read, the cached count is stale so ask the module again
+            self._avail_cache = 0
+        else:
+            self._avail_cache = max(0, self._avail_cache - count)
+
+    def _wait(self, last_data):
+        """Paces polling while no data is available, backing off once
+        nothing has arrived for _BUSY_POLL_WINDOW seconds.
+        :param float last_data: time.monotonic() at which data last arrived.
+
+        """
+        if not self._busy_poll or time.monotonic() - last_data > _BUSY_POLL_WINDOW:
+            time.sleep(_IDLE_POLL_SLEEP)
+
+    def _coalesce(self, avail, to_read, last_data):
+        """Returns True when a read of avail bytes is small enough to be worth
+        waiting for more data to arrive first, after sleeping out the rest of
+        _COALESCE_WINDOW, so each hold-back costs at most one extra query.
+        :param int avail: Bytes available on the module.
+        :param int to_read: Bytes still wanted by the caller.
+        :param float last_data: time.monotonic() at which data last arrived.
+
+        """
+        if avail >= min(to_read, _MIN_READ_CHUNK):
+            return False
+        remaining = _COALESCE_WINDOW - (time.monotonic() - last_data)
+        if remaining <= 0:
+            return False
+        time.sleep(remaining)
+        self._avail_cache = 0  # ask the module again after the wait
+        return True
 
     def recv(self, bufsize=0):
         """Reads some bytes from the connected remote address.
         :param int bufsize: maximum number of bytes to receive
         """
         # print("Socket read", bufsize)
+        if 0 < bufsize <= self._tail - self._head:
+            # already received, e.g. small reads after readline: no AT commands
+            ret = bytes(memoryview(self._buf)[self._head : self._head + bufsize])
+            self._head += bufsize
+            self._scanned = 0
+            return ret
+
         if bufsize == 0:  # read as much as we can at the moment
+            available = self.available
+            spill = None
             while True:
-                avail = self.available()
-                if avail:
-                    self._buffer += _the_interface.socket_read(self._socknum, avail)
-                else:
+                avail = available()
+                if not avail:
                     break
-            gc.collect()
-            ret = self._buffer
-            self._buffer = b""
-            gc.collect()
+                room = len(self._buf) - (self._tail - self._head)
+                if not room:
+                    # spill the full receive buffer rather than growing it
+                    if spill is None:
+                        spill = bytearray()
+                    spill.extend(memoryview(self._buf)[self._head : self._tail])
+                    self._head = self._tail = self._scanned = 0
+                    room = len(self._buf)
+                if not self._fill(min(avail, room)):
+                    break  # no progress, return what we have
+            pending = memoryview(self._buf)[self._head : self._tail]
+            if spill is None:
+                ret = bytes(pending)
+            else:
+                spill.extend(pending)
+                ret = bytes(spill)
+                spill = None
+            self._head = self._tail = self._scanned = 0
+            if len(ret) > _GC_THRESHOLD:
+                gc.collect()
             return ret
-        stamp = time.monotonic()
 
-        to_read = bufsize - len(self._buffer)
-        received = []
-        while to_read > 0:
-            # print("Bytes to read:", to_read)
-            avail = self.available()
+        if bufsize > len(self._buf):
+            # too large for the receive buffer, read straight into the result
+            buf = bytearray(bufsize)
+            count = self.recv_into(buf, bufsize)
+            return bytes(buf) if count == bufsize else bytes(memoryview(buf)[:count])
+
+        mv = memoryview(self._buf)
+        pending = self._tail - self._head
+        # move pending data to the front, then receive the rest behind it
+        if self._head:
+            mv[:pending] = mv[self._head : self._tail]
+        count = self._read_into(mv, pending, bufsize)
+        ret = bytes(mv[:count])
+        self._head = self._tail = self._scanned = 0
+        return ret
+
+    def recv_into(self, buffer, nbytes=0):
+        """Reads some bytes from the connected remote address directly
+        into buffer. Returns the number of bytes received.
+        :param bytearray buffer: Buffer (or memoryview) to receive into.
+        :param int nbytes: maximum number of bytes to receive, defaults to len(buffer)
+        """
+        if not nbytes:
+            nbytes = len(buffer)
+        elif nbytes > len(buffer):
+            raise RuntimeError("nbytes must not exceed the size of the buffer")
+        mv = memoryview(buffer)
+        # hand over anything readline left in the receive buffer first
+        written = min(nbytes, self._tail - self._head)
+        mv[:written] = memoryview(self._buf)[self._head : self._head + written]
+        self._head += written
+        self._scanned = 0
+        return self._read_into(mv, written, nbytes)
+
+    def _read_into(self, mv, written, nbytes):
+        """Receives from the module into mv until it holds nbytes or the
+        socket times out. Returns the number of bytes held.
+        :param memoryview mv: Destination buffer.
+        :param int written: Bytes already held at the start of mv.
+        :param int nbytes: Bytes wanted in total.
+
+        """
+        # bind hot-loop lookups to locals, globals are dict lookups on MicroPython
+        monotonic = time.monotonic
+        available = self.available
+        read_into = _the_interface.socket_read_into
+        socknum = self._socknum
+        timeout = self._timeout
+        last_data = monotonic()
+        # each chunk received extends the deadline, None waits forever
+        deadline = last_data + timeout if timeout > 0 else None
+
+        while written < nbytes:
+            avail = available()
+            if avail and self._coalesce(avail, nbytes - written, last_data):
+                continue
             if avail:
-                stamp = time.monotonic()
-                recv = _the_interface.socket_read(self._socknum, min(to_read, avail))
-                received.append(recv)
-                to_read -= len(recv)
-                gc.collect()
-            if self._timeout > 0 and time.monotonic() - stamp > self._timeout:
+                want = min(nbytes - written, avail)
+                count = read_into(socknum, mv[written : written + want])
+                written += count
+                self._consumed(count, want)
+                if count:
+                    last_data = monotonic()
+                    if deadline is not None:
+                        deadline = last_data + timeout
+                    continue
+            # nothing available, or a read that made no progress
+            self._wait(last_data)
+            if deadline is not None and monotonic() > deadline:
                 break
-        # print(received)
-        self._buffer += b"".join(received)
-
-        ret = None
-        if len(self._buffer) == bufsize:
-            ret = self._buffer
-            self._buffer = b""
-        else:
-            ret = self._buffer[:bufsize]
-            self._buffer = self._buffer[bufsize:]
-        gc.collect()
-        return ret
+        return written
 
     def readline(self):
         """Attempt to return as many bytes as we can up to but not including '\r\n'"""
         # print("Socket readline")
-        stamp = time.monotonic()
-        while b"\r\n" not in self._buffer:
+        monotonic = time.monotonic
+        available = self.available
+        fill = self._fill
+        find = self._buf.find  # _fill only ever grows the buffer in place
+        last_data = monotonic()
+        deadline = last_data + self._timeout if self._timeout > 0 else None
+        while True:
+            # only search bytes that arrived since the last pass
+            eol = find(b"\r\n", self._head + self._scanned, self._tail)
+            if eol >= 0:
+                break
+            # a '\r' at the very end may be completed by the next read
+            self._scanned = max(0, self._tail - self._head - 1)
             # there's no line already in there, read some more
-            avail = self.available()
-            if avail:
-                self._buffer += _the_interface.socket_read(self._socknum, avail)
-            elif self._timeout > 0 and time.monotonic() - stamp > self._timeout:
+            avail = available()
+            if avail and fill(avail):
+                last_data = monotonic()
+            elif deadline is not None and monotonic() > deadline:
                 self.close()  # Make sure to close socket so that we don't exhaust sockets.
                 raise RuntimeError("Didn't receive full response, failing out")
-        firstline, self._buffer = self._buffer.split(b"\r\n", 1)
-        gc.collect()
+            else:
+                self._wait(last_data)
+        firstline = bytes(memoryview(self._buf)[self._head : eol])
+        self._head = eol + 2
+        self._scanned = 0
         return firstline
 
     def available(self):
         """Returns how many bytes are available to be read from the socket.
+        The module is only queried once the previously reported bytes have
+        been read.
 
         """
-        return _the_interface.socket_available(self._socknum)
+        if not self._avail_cache:
+            self._avail_cache = _the_interface.socket_available(self._socknum) or 0
+        return self._avail_cache
 
     def settimeout(self, value):
         """Sets socket read timeout.
@@ -247,5 +533,19 @@ class socket:
         return self._timeout
 
     def close(self):
-        """Closes the socket."""
-        return _the_interface.socket_close(self._socknum)
+        """Closes the socket. Its receive buffer is handed on to the
+        next socket created.
+
+        """
+        if self._socknum == NO_SOCKET_AVAIL:
+            return True  # already closed
+        ret = _the_interface.socket_close(self._socknum)
+        _free_slot(self._socknum)
+        self._socknum = NO_SOCKET_AVAIL
+        self._head = self._tail = self._scanned = self._avail_cache = 0
+        # buffers grown by long lines are dropped rather than kept around
+        if len(self._buf) == _RECV_BUF_SIZE and len(_BUFFER_POOL) < _BUFFER_POOL_SIZE:
+            _BUFFER_POOL.append(self._buf)
+        self._buf = bytearray()
+        return ret
+
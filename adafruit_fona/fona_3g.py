@@ -56,6 +56,8 @@ class FONA3G(FONA):
 
     """
 
+    max_sockets = FONA_MAX_SOCKETS  # sockets supported by the module
+
     def __init__(self, uart, rst, ri=None, debug=False):
         uart.baudrate = 4800
         super(FONA3G, self).__init__(uart, rst, ri, debug)
@@ -197,28 +199,32 @@ class FONA3G(FONA):
             return False
         return self._buf
 
-    def get_socket(self):
-        """Returns an unused socket."""
+    def get_socket(self, claimed=0):
+        """Returns an unused socket, or FONA_MAX_SOCKETS if there is none.
+        :param int claimed: Bitmask of sockets the caller already holds, to skip.
+        """
         if self._debug:
             print("*** Get socket")
 
         self._read_line()
         self._uart_write(b"AT+CIPOPEN?\r\n")  # Query which sockets are busy
 
-        socket = 0
+        allocated_socket = FONA_MAX_SOCKETS
         for socket in range(0, FONA_MAX_SOCKETS):
             self._read_line(120000)
             try:  # SIMCOM5320 lacks a socket connection status, this is a workaround
                 self._parse_reply(b"+CIPOPEN: ", idx=1)
             except IndexError:
-                break
+                if not claimed & (1 << socket):
+                    allocated_socket = socket
+                    break
 
         for _ in range(socket, FONA_MAX_SOCKETS):
             self._read_line()  # eat the rest of '+CIPOPEN' responses
 
         if self._debug:
-            print("Allocated socket #%d" % socket)
-        return socket
+            print("Allocated socket #%d" % allocated_socket)
+        return allocated_socket
 
     def socket_connect(self, sock_num, dest, port, conn_mode=0):
         """Connects to a destination IP address or hostname.
@@ -237,10 +243,7 @@ class FONA3G(FONA):
             )
 
         self._uart.reset_input_buffer()
-        assert (
-            sock_num < FONA_MAX_SOCKETS
-        ), "Provided socket exceeds the maximum number of \
-                                             sockets for the FONA module."
+        self._check_socket(sock_num)
         self._send_check_reply(b"AT+CIPHEAD=0", reply=REPLY_OK)  # do not show ip header
         self._send_check_reply(
             b"AT+CIPSRIP=0", reply=REPLY_OK
@@ -261,10 +264,7 @@ class FONA3G(FONA):
     def remote_ip(self, sock_num):
         """Returns the IP address of sender."""
         self._read_line()
-        assert (
-            sock_num < FONA_MAX_SOCKETS
-        ), "Provided socket exceeds the maximum number of \
-                                             sockets for the FONA module."
+        self._check_socket(sock_num)
 
         self._uart_write(b"AT+CIPOPEN?\r\n")
         for _ in range(0, sock_num + 1):
@@ -279,23 +279,24 @@ class FONA3G(FONA):
     def socket_write(self, sock_num, buffer, timeout=120000):
         """Writes bytes to the socket.
         :param int sock_num: Desired socket number to write to.
-        :param bytes buffer: Bytes to write to socket.
+        :param bytes buffer: Bytes to write to socket, or a list/tuple of byte
+                             buffers to send back to back in a single write.
         :param int timeout: Socket write timeout, in milliseconds. Defaults to 120000ms.
 
         """
+        if not isinstance(buffer, (list, tuple)):
+            buffer = (buffer,)
         self._read_line()
-        assert (
-            sock_num < FONA_MAX_SOCKETS
-        ), "Provided socket exceeds the maximum number of \
-                                             sockets for the FONA module."
+        self._check_socket(sock_num)
 
         self._uart.reset_input_buffer()
 
+        length = sum(len(fragment) for fragment in buffer)
         self._uart_write(
             b"AT+CIPSEND="
             + str(sock_num).encode()
             + b","
-            + str(len(buffer)).encode()
+            + str(length).encode()
             + b"\r\n"
         )
         self._read_line()
@@ -303,13 +304,15 @@ class FONA3G(FONA):
             # promoting mark ('>') not found
             return False
 
-        self._uart_write(buffer + b"\r\n")
+        for fragment in buffer:
+            self._uart_write(fragment)
+        self._uart_write(b"\r\n")
         self._read_line()  # eat 'OK'
 
         self._read_line(3000)  # expect +CIPSEND: rx,tx
         if not self._parse_reply(b"+CIPSEND:", idx=1):
             return False
-        if not self._buf == len(buffer):  # assert data sent == buffer size
+        if not self._buf == length:  # assert data sent == buffer size
             return False
 
         self._read_line(timeout)
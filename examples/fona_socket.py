@@ -0,0 +1,75 @@
+# pylint: disable=unused-import
+import time
+import board
+import busio
+import digitalio
+from adafruit_fona.adafruit_fona import FONA
+from adafruit_fona.fona_3g import FONA3G
+import adafruit_fona.adafruit_fona_network as network
+import adafruit_fona.adafruit_fona_socket as cellular_socket
+
+print("FONA Socket Test")
+
+HOST = "wifitest.adafruit.com"
+PATH = "/testwifi/index.html"
+
+# Get GPRS details and more from a secrets.py file
+try:
+    from secrets import secrets
+except ImportError:
+    print("GPRS secrets are kept in secrets.py, please add them there!")
+    raise
+
+# Create a serial connection for the FONA connection
+uart = busio.UART(board.TX, board.RX)
+rst = digitalio.DigitalInOut(board.D4)
+
+# Use this for FONA800 and FONA808
+fona = FONA(uart, rst)
+
+# Use this for FONA3G
+# fona = FONA3G(uart, rst)
+
+# Initialize cellular data network
+network = network.CELLULAR(
+    fona, (secrets["apn"], secrets["apn_username"], secrets["apn_password"])
+)
+
+while not network.is_attached:
+    print("Attaching to network...")
+    time.sleep(0.5)
+print("Attached!")
+
+while not network.is_connected:
+    print("Connecting to network...")
+    network.connect()
+    time.sleep(0.5)
+print("Network Connected!")
+
+# Set the socket interface
+cellular_socket.set_interface(fona)
+
+# Lookups are cached, so repeated requests to HOST skip the DNS query
+addr = cellular_socket.getaddrinfo(HOST, 80)[0][-1]
+
+for i in range(3):
+    # each socket reuses the receive buffer of the previously closed one
+    sock = cellular_socket.socket()
+    sock.settimeout(10)
+    print("Connecting to", addr)
+    sock.connect(addr)
+    # send the request line and headers without joining them first
+    sock.send_iovec(
+        (b"GET ", PATH.encode(), b" HTTP/1.0\r\nHost: ", HOST.encode(), b"\r\n\r\n")
+    )
+    print("Status:", sock.readline())
+    length = 0
+    while True:
+        header = sock.readline()
+        if not header:  # blank line ends the headers
+            break
+        if header.lower().startswith(b"content-length:"):
+            length = int(header[15:])
+    print(sock.recv(length))
+    sock.close()
+    time.sleep(5)